@@ -0,0 +1,26 @@
+"""
+Optionale Numba-Kernel für Massenoperationen auf Regionen
+"""
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    np = None
+    njit = None
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # Ohne fastmath: das erlaubt LLVM, die Division durch einen Kehrwert zu ersetzen
+    @njit(cache=True)
+    def transform_coords_bulk(coords, scale_factor):
+        """Teilt ein (N, 4)-Float-Array durch scale_factor und schneidet auf int32 ab (wie int(x / s))"""
+        out = np.empty(coords.shape, dtype=np.int32)
+        for i in range(coords.shape[0]):
+            for j in range(4):
+                out[i, j] = np.int32(coords[i, j] / scale_factor)
+        return out
+else:
+    transform_coords_bulk = None
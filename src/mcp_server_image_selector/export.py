@@ -2,11 +2,15 @@
 Export-Funktionen für Bildausschnitte
 """
 
+import functools
+import logging
 import os
-import sys
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from PIL import Image
 
+from .utils import transform_coords_bulk
+
 try:
     import pytesseract
     TESSERACT_AVAILABLE = True
@@ -14,22 +18,132 @@ except ImportError:
     pytesseract = None
     TESSERACT_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
+# Obergrenze für parallele Export-Threads
+MAX_EXPORT_WORKERS = 8
+
+# Unterhalb dieser Fläche lohnt sich die stärkere Kompression (Dateien bleiben klein)
+SMALL_CROP_AREA = 256 * 256
+
+
+def export_path_prefix(base_name: str, timestamp: str, working_dir: str) -> str:
+    """Gemeinsamer Pfad-Präfix aller Regionen eines Bildes (einmal pro Export berechnet)"""
+    return os.path.join(working_dir, f"{base_name}_{timestamp}_region")
+
+
+def format_export_paths_fast(prefix: str, i: int, mode: str, image_format: str = "PNG") -> dict:
+    """Wie format_export_paths, aber auf Basis eines vorberechneten export_path_prefix()."""
+    if mode == "foto":
+        ext = "jpg" if image_format == "JPEG" else "png"
+        return {"type": "foto", "file": f"{prefix}{i:02d}_foto.{ext}", "region": i}
+    else:
+        return {
+            "type": "text",
+            "image_file": f"{prefix}{i:02d}_text.png",
+            "text_file": f"{prefix}{i:02d}_text.txt",
+            "region": i,
+        }
+
 
-def format_export_paths(base_name: str, timestamp: str, i: int, mode: str, working_dir: str) -> dict:
+def format_export_paths(
+    base_name: str, timestamp: str, i: int, mode: str, working_dir: str, image_format: str = "PNG"
+) -> dict:
     """Erzeugt die Ausgabe-Pfade für einen exportierten Bereich.
 
+    image_format bestimmt die Endung von Foto-Bereichen ("PNG" oder "JPEG");
+    Text-Bereiche werden für die OCR immer als PNG abgelegt.
+
     Rückgabe: dict mit keys abhängig vom Modus ('foto' -> file, 'text' -> image_file,text_file).
     """
-    if mode == "foto":
-        output_file = os.path.join(working_dir, f"{base_name}_{timestamp}_region{i:02d}_foto.png")
-        return {"type": "foto", "file": output_file, "region": i}
+    prefix = export_path_prefix(base_name, timestamp, working_dir)
+    return format_export_paths_fast(prefix, i, mode, image_format)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_original(image_path: str, mtime: float) -> Image.Image:
+    """Lädt und dekodiert ein Quellbild; mtime im Cache-Key verwirft Einträge bei Dateiänderung"""
+    img = Image.open(image_path)
+    # Vollständig laden: Folge-Exporte sparen das Dekodieren, und der Dateihandle wird freigegeben
+    img.load()
+    return img
+
+
+def _png_save_options(crop: Image.Image) -> dict:
+    """PNG-Optionen: schnelle Deflate-Stufe für große Crops, Standardstufe für kleine"""
+    width, height = crop.size
+    if width * height < SMALL_CROP_AREA:
+        return {"compress_level": 6, "optimize": False}
+    return {"compress_level": 1, "optimize": False}
+
+
+def _foto_export_format(image: Image.Image, image_path: str) -> str:
+    """Wählt das Format für Foto-Bereiche: JPEG bei JPEG-Quellen, sonst PNG.
+
+    Gedrehte Bilder haben kein format mehr, dann entscheidet die Dateiendung.
+    Modi mit Alpha oder Palette bleiben PNG.
+    """
+    if image.mode not in ("RGB", "L"):
+        return "PNG"
+    if image.format is not None:
+        return "JPEG" if image.format == "JPEG" else "PNG"
+    ext = os.path.splitext(image_path)[1].lower()
+    return "JPEG" if ext in (".jpg", ".jpeg") else "PNG"
+
+
+def _save_region(crop: Image.Image, info: dict, image_path: str, foto_format: str = "PNG") -> dict:
+    """Speichert einen einzelnen Crop (und bei Text-Bereichen OCR-Text) und gibt info zurück"""
+    if info["type"] == "foto":
+        if foto_format == "JPEG":
+            # Fotografische Inhalte: JPEG kodiert deutlich schneller und kleiner als PNG
+            crop.save(info["file"], "JPEG", quality=95, subsampling=0, optimize=False)
+        else:
+            crop.save(info["file"], "PNG", **_png_save_options(crop))
+        return info
+
+    png_options = _png_save_options(crop)
+
+    crop.save(info["image_file"], "PNG", **png_options)
+
+    # OCR mit Tesseract durchführen, falls verfügbar
+    ocr_text = ""
+    if TESSERACT_AVAILABLE and pytesseract:
+        try:
+            # Tesseract auf dem Crop-Bild ausführen
+            # Sprache: Deutsch + Englisch
+            ocr_text = pytesseract.image_to_string(crop, lang='deu+eng')
+            if ocr_text.strip():
+                ocr_text = ocr_text.strip()
+            else:
+                ocr_text = "[Kein Text erkannt]"
+        except Exception as e:
+            ocr_text = f"[OCR-Fehler: {str(e)}]"
     else:
-        img_file = os.path.join(working_dir, f"{base_name}_{timestamp}_region{i:02d}_text.png")
-        text_file = os.path.join(working_dir, f"{base_name}_{timestamp}_region{i:02d}_text.txt")
-        return {"type": "text", "image_file": img_file, "text_file": text_file, "region": i}
+        ocr_text = "[Tesseract nicht verfügbar - bitte installieren: pip install pytesseract]"
+
+    # Sidecar vorab komplett kodieren und mit einem write() auf den rohen FD schreiben
+    payload = (
+        f"Textbereich {info['region']}\n"
+        f"Bildquelle: {info['image_file']}\n"
+        f"Original: {image_path}\n"
+        f"\n{ocr_text}\n"
+    ).encode("utf-8")
+    fd = os.open(info["text_file"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+    return info
 
 
-def export_regions(image_path: str, regions: list, working_dir: str, image_object: Image.Image = None) -> dict:
+def export_timestamp() -> str:
+    """Zeitstempel für Export-Dateinamen (Sekundenauflösung, lokale Zeit)"""
+    return time.strftime("%Y%m%d_%H%M%S")
+
+
+def export_regions(
+    image_path: str, regions: list, working_dir: str, image_object: Image.Image = None, timestamp: str = None
+) -> dict:
     """Exportiert die ausgewählten Bereiche
 
     Args:
@@ -38,75 +152,142 @@ def export_regions(image_path: str, regions: list, working_dir: str, image_objec
         working_dir: Ausgabeverzeichnis
         image_object: Optional - bereits geladenes/gedrehtes PIL Image Objekt.
                      Wenn None, wird das Bild von image_path geladen.
+        timestamp: Optional - gemeinsamer Zeitstempel, z.B. für alle Bilder eines Exports.
+                   Wenn None, wird der aktuelle Zeitpunkt verwendet.
     """
 
+    if timestamp is None:
+        timestamp = export_timestamp()
+
+    max_workers = min(MAX_EXPORT_WORKERS, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = _submit_regions(executor, image_path, regions, working_dir, image_object, timestamp)
+        exported_files = _collect_exported(futures)
+
+    return {
+        "success": True,
+        "exported_count": len(exported_files),
+        "files": exported_files,
+        "working_dir": working_dir,
+    }
+
+
+def export_regions_multi(images_data: list, working_dir: str, timestamp: str = None) -> dict:
+    """Exportiert die Regionen mehrerer Bilder (z.B. ImageSelectorGUI.run()) in einem Durchgang
+
+    Die Regionen liegen in Display-Koordinaten vor und werden pro Bild mit dessen
+    scale_factor umgerechnet. Alle Bilder teilen sich Zeitstempel und Thread-Pool.
+
+    Args:
+        images_data: Liste von Dicts mit original_path, original_image, scale_factor, regions
+        working_dir: Ausgabeverzeichnis
+        timestamp: Optional - gemeinsamer Zeitstempel, Standard: aktueller Zeitpunkt
+    """
+    if timestamp is None:
+        timestamp = export_timestamp()
+
+    exported_files = []
+
+    max_workers = min(MAX_EXPORT_WORKERS, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = []
+        for img_data in images_data:
+            if not img_data['regions']:
+                continue
+
+            # Koordinaten umrechnen (ein Aufruf pro Bild)
+            coords_list = transform_coords_bulk(
+                [region["coords"] for region in img_data['regions']],
+                img_data['scale_factor']
+            )
+            regions = [
+                dict(region, coords=coords) for region, coords in zip(img_data['regions'], coords_list)
+            ]
+
+            pending.append(_submit_regions(
+                executor,
+                img_data['original_path'],
+                regions,
+                working_dir,
+                img_data['original_image'],
+                timestamp,
+            ))
+
+        # Ergebnisse pro Bild in Eingabereihenfolge einsammeln
+        for futures in pending:
+            exported_files.extend(_collect_exported(futures))
+
+    return {
+        "success": True,
+        "exported_count": len(exported_files),
+        "files": exported_files,
+        "working_dir": working_dir,
+    }
+
+
+def _submit_regions(
+    executor, image_path: str, regions: list, working_dir: str, image_object: Image.Image, timestamp: str
+) -> dict:
+    """Erzeugt die Crops eines Bildes und übergibt das Speichern an den Executor
+
+    Rückgabe: dict Future -> Regionsnummer
+    """
     base_name = os.path.splitext(os.path.basename(image_path))[0]
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     # Use provided image object if available (e.g., after rotation),
     # otherwise load from file
     if image_object is not None:
         original_image = image_object
     else:
-        original_image = Image.open(image_path)
+        original_image = _load_original(image_path, os.path.getmtime(image_path))
 
-    # Ermittle scale_factor (falls nötig - hier nehmen wir an, coords sind bereits original)
-    # In der GUI werden die Koordinaten bereits umgerechnet
+    foto_format = _foto_export_format(original_image, image_path)
+    prefix = export_path_prefix(base_name, timestamp, working_dir)
 
-    exported_files = []
+    # Regionen von oben nach unten verarbeiten, damit aufeinanderfolgende Crops
+    # benachbarte Zeilen des Quellbilds lesen; die Nummerierung bleibt erhalten
+    ordered = sorted(enumerate(regions, 1), key=lambda item: (item[1]["coords"][1], item[1]["coords"][0]))
 
-    for i, region in enumerate(regions, 1):
+    # Crops im aufrufenden Thread erzeugen, das Kodieren/Schreiben (PNG, OCR)
+    # parallel ausführen - libpng gibt dabei den GIL frei
+    iw, ih = original_image.size
+    futures = {}
+    for i, region in ordered:
         coords = region["coords"]
         mode = region["mode"]
 
-        # coords sind in Display-Koordinaten - hier müssten sie umgerechnet werden
-        # Für dieses Beispiel gehen wir davon aus, dass sie bereits korrekt sind
+        # Koordinaten sind bereits Original-Koordinaten (die GUI bzw. der Server
+        # rechnet sie vor dem Export mit dem scale_factor um)
         x1, y1, x2, y2 = coords
 
-        # Direkt als Original-Koordinaten verwenden (GUI sollte diese liefern)
-        # Hier vereinfachte Annahme - in Produktion scale_factor übergeben
+        # Auf die Bildgrenzen beschneiden; Regionen ganz außerhalb werden
+        # übersprungen statt als leeres/gepolstertes Bild gespeichert
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(iw, int(x2)), min(ih, int(y2))
+        if x2 <= x1 or y2 <= y1:
+            logger.warning("Region %s liegt außerhalb des Bildes und wird übersprungen: %s", i, coords)
+            continue
 
         try:
-            # crop using provided coordinates
-            crop = original_image.crop((int(x1), int(y1), int(x2), int(y2)))
+            crop = original_image.crop((x1, y1, x2, y2))
+            info = format_export_paths_fast(prefix, i, mode, foto_format)
+        except Exception as e:
+            logger.warning("Fehler beim Export von Region %s: %s", i, e)
+            continue
 
-            info = format_export_paths(base_name, timestamp, i, mode, working_dir)
+        futures[executor.submit(_save_region, crop, info, image_path, foto_format)] = i
 
-            if info["type"] == "foto":
-                crop.save(info["file"], "PNG")
-                exported_files.append(info)
-            else:
-                crop.save(info["image_file"], "PNG")
-
-                # OCR mit Tesseract durchführen, falls verfügbar
-                ocr_text = ""
-                if TESSERACT_AVAILABLE and pytesseract:
-                    try:
-                        # Tesseract auf dem Crop-Bild ausführen
-                        # Sprache: Deutsch + Englisch
-                        ocr_text = pytesseract.image_to_string(crop, lang='deu+eng')
-                        if ocr_text.strip():
-                            ocr_text = ocr_text.strip()
-                        else:
-                            ocr_text = "[Kein Text erkannt]"
-                    except Exception as e:
-                        ocr_text = f"[OCR-Fehler: {str(e)}]"
-                else:
-                    ocr_text = "[Tesseract nicht verfügbar - bitte installieren: pip install pytesseract]"
-
-                with open(info["text_file"], "w", encoding="utf-8") as f:
-                    f.write(f"Textbereich {i}\n")
-                    f.write(f"Bildquelle: {info['image_file']}\n")
-                    f.write(f"Original: {image_path}\n")
-                    f.write(f"\n{ocr_text}\n")
-                exported_files.append(info)
+    return futures
 
+
+def _collect_exported(futures: dict) -> list:
+    """Wartet auf die Speicher-Tasks eines Bildes; Rückgabe nach Regionsnummer sortiert"""
+    exported_files = []
+    for future in as_completed(futures):
+        try:
+            exported_files.append(future.result())
         except Exception as e:
-            print(f"Fehler beim Export von Region {i}: {e}", file=sys.stderr)
+            logger.warning("Fehler beim Export von Region %s: %s", futures[future], e)
 
-    return {
-        "success": True,
-        "exported_count": len(exported_files),
-        "files": exported_files,
-        "working_dir": working_dir,
-    }
+    exported_files.sort(key=lambda info: info["region"])
+    return exported_files
@@ -5,19 +5,45 @@ GUI-Komponente für die Bildausschnitt-Selektion
 import tkinter as tk
 from tkinter import messagebox, filedialog
 from PIL import Image, ImageTk
+from typing import Optional
 import os
 
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    cv2 = None
+    np = None
+    CV2_AVAILABLE = False
+
+# Resampling-Filter einmalig auflösen statt bei jeder Anzeige
+_LANCZOS = Image.Resampling.LANCZOS
+_BOX = Image.Resampling.BOX
+
+# Filter für reine Anzeige-Kopien ohne GUI; Exporte schneiden immer aus dem Original
+DISPLAY_RESAMPLE = Image.Resampling.BILINEAR
+
+# Modi, die Image.reduce() sinnvoll mitteln kann (nicht "P"/"1": Palette bzw. Bitmaske)
+_REDUCE_MODES = ("L", "LA", "RGB", "RGBA")
+
 
 class ImageSelectorGUI:
     """GUI-Komponente für die Bildauswahl"""
 
-    def __init__(self, image_path: str, working_dir: str, create_ui: bool = True):
+    def __init__(self, image_path: str, working_dir: str, create_ui: bool = True, cleanup: Optional[bool] = None):
         from .utils import cleanup_tmp_dir
 
         self.working_dir = working_dir
         self.create_ui = create_ui
         self.result_ready = False
-        cleanup_tmp_dir()
+
+        # tmp-Verzeichnis nur für interaktive Sitzungen leeren (Standard);
+        # headless/Test-Instanzen sparen sich den Verzeichnis-Scan
+        if cleanup is None:
+            cleanup = create_ui
+        if cleanup:
+            cleanup_tmp_dir()
 
         # Multi-image support: Liste aller geladenen Bilder
         self.images_data = []  # Liste von Dicts: {original_path, image_path, is_pdf, extracted_path, original_image, scale_factor, regions}
@@ -57,6 +83,13 @@ class ImageSelectorGUI:
             self.selection_mode = _DummyVar("foto")
         self.current_selection = None
 
+        # Zuletzt bekannte Canvas-Größe (wird über <Configure> aktualisiert)
+        self._canvas_size = (0, 0)
+
+        # NumPy-Ansicht des Originalbilds für die OpenCV-Skalierung (nur bei Bildwechsel neu)
+        self._display_array = None
+        self._display_array_source = None
+
         # Erstes Bild laden
         self._add_image(image_path)
 
@@ -75,6 +108,15 @@ class ImageSelectorGUI:
         # 25% Vergrößerung: max 1.25 statt 1.0
         return min(scale_x, scale_y, 1.25)
 
+    @staticmethod
+    def format_region_labels(regions: list, start: int = 1) -> list:
+        """Erzeugt die Listbox-Einträge für Regionen in einem Durchlauf."""
+        labels = []
+        for i, region in enumerate(regions, start):
+            x1, y1, x2, y2 = region["coords"]
+            labels.append(f"{i}. {region['mode'].upper()} ({int(x2 - x1)}x{int(y2 - y1)})")
+        return labels
+
     def _add_image(self, image_path: str):
         """Fügt ein neues Bild zur Liste hinzu"""
         from pathlib import Path
@@ -260,6 +302,9 @@ class ImageSelectorGUI:
         self.h_scroll.config(command=self.canvas.xview)
         self.v_scroll.config(command=self.canvas.yview)
 
+        # Canvas-Größe cachen statt bei jeder Anzeige root.update() aufzurufen
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
+
         # Mouse Events
         self.canvas.bind("<ButtonPress-1>", self.on_mouse_down)
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
@@ -311,27 +356,32 @@ class ImageSelectorGUI:
         self.region_listbox = tk.Listbox(region_list_frame, width=25)
         self.region_listbox.pack(fill=tk.BOTH, expand=True)
 
+        # Einmalig das Layout berechnen, damit die erste Anzeige die echte Canvas-Größe kennt
+        self.root.update_idletasks()
+        self._canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+
     def _load_current_image(self):  # pragma: no cover
         """Lädt das aktuell ausgewählte Bild"""
         try:
             # Lade PIL Image wenn noch nicht geladen
             if self.original_image is None:
-                img = Image.open(self.image_path)
-                self.original_image = img
+                from .image_cache import load_image_cached
+
+                cache_dir = os.path.join(self.working_dir, ".cache")
+                # Aus PDFs extrahierte Bilder werden bei jedem Öffnen neu geschrieben ->
+                # Cache-Eintrag an das PDF selbst binden
+                source_path = None
+                if self.is_pdf:
+                    source_path = self.original_image_path
+                    if not os.path.isabs(source_path):
+                        source_path = os.path.join(self.working_dir, source_path)
+                self.original_image = load_image_cached(self.image_path, cache_dir, source_path)
 
             # If GUI is created, display on canvas. Otherwise compute scale only.
             if self.create_ui:
                 self._display_image()
             else:
-                # use default canvas fallback sizes as in _display_image
-                canvas_width = 1600  # 25% größer als 1280
-                canvas_height = 1280  # 25% größer als 1024
-                img_width, img_height = self.original_image.size
-                self.scale_factor = self.compute_scale(img_width, img_height, canvas_width, canvas_height)
-                # Precompute a resized image for downstream processing if desired
-                new_width = int(img_width * self.scale_factor)
-                new_height = int(img_height * self.scale_factor)
-                self.image = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                self._update_headless_image()
         except Exception as e:
             if self.create_ui:
                 messagebox.showerror("Fehler", f"Bild konnte nicht geladen werden: {e}")
@@ -339,14 +389,34 @@ class ImageSelectorGUI:
             else:
                 raise
 
+    def _update_headless_image(self):
+        """Berechnet Skalierung und verkleinertes Bild ohne GUI (Standard-Canvas-Größe)"""
+        # use default canvas fallback sizes as in _display_image
+        canvas_width = 1600  # 25% größer als 1280
+        canvas_height = 1280  # 25% größer als 1024
+        img_width, img_height = self.original_image.size
+        self.scale_factor = self.compute_scale(img_width, img_height, canvas_width, canvas_height)
+        # Nur Anzeige-Kopie: günstiger Filter, das Original bleibt für den Export erhalten
+        new_width = int(img_width * self.scale_factor)
+        new_height = int(img_height * self.scale_factor)
+
+        source = self.original_image
+        if self.scale_factor < 1 and source.mode in _REDUCE_MODES:
+            # Nahezu ganzzahliger Verkleinerungsfaktor: erst per reduce() (Box-Mittelung)
+            # grob verkleinern, dann nur noch die kleine Restskalierung. Andere Modi
+            # skaliert resize() direkt (bei "P"/"1" mit NEAREST)
+            inverse = 1 / self.scale_factor
+            factor = round(inverse)
+            if factor >= 2 and abs(inverse - factor) < 0.1:
+                source = source.reduce(factor)
+
+        self.image = source.resize((new_width, new_height), DISPLAY_RESAMPLE)
+
     def _display_image(self):  # pragma: no cover
         """Zeigt das Bild auf dem Canvas an"""
         if self.original_image:
-            # Skalierung berechnen
-            # Skalierung berechnen
-            self.root.update()
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
+            # Skalierung berechnen (Canvas-Größe aus dem <Configure>-Cache)
+            canvas_width, canvas_height = self._canvas_size
 
             if canvas_width <= 1:
                 canvas_width = 1600  # 25% größer als 1280
@@ -359,7 +429,24 @@ class ImageSelectorGUI:
             new_width = int(img_width * self.scale_factor)
             new_height = int(img_height * self.scale_factor)
 
-            self.image = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            if CV2_AVAILABLE and self.original_image.mode in ("L", "RGB", "RGBA"):
+                # OpenCV skaliert deutlich schneller als Pillow
+                if self.scale_factor < 1:
+                    interpolation = cv2.INTER_AREA
+                else:
+                    interpolation = cv2.INTER_LANCZOS4
+                resized = cv2.resize(
+                    self._get_display_array(), (new_width, new_height), interpolation=interpolation
+                )
+                self.image = Image.fromarray(resized)
+            else:
+                # Starke Verkleinerung: BOX (reine Mittelung) reicht für die Vorschau
+                # und ist deutlich schneller als LANCZOS
+                if self.scale_factor < 0.5:
+                    resample = _BOX
+                else:
+                    resample = _LANCZOS
+                self.image = self.original_image.resize((new_width, new_height), resample)
             self.photo = ImageTk.PhotoImage(self.image)
 
             self.canvas.config(scrollregion=(0, 0, new_width, new_height))
@@ -368,6 +455,17 @@ class ImageSelectorGUI:
                 0, 0, anchor=tk.NW, image=self.photo
             )
 
+    def _get_display_array(self):  # pragma: no cover
+        """Gibt das Originalbild als NumPy-Array zurück (gecacht bis zum nächsten Bildwechsel)"""
+        if self._display_array_source is not self.original_image:
+            self._display_array = np.asarray(self.original_image)
+            self._display_array_source = self.original_image
+        return self._display_array
+
+    def on_canvas_configure(self, event):  # pragma: no cover
+        """Merkt sich die aktuelle Canvas-Größe bei Größenänderungen"""
+        self._canvas_size = (event.width, event.height)
+
     def _update_image_list(self):  # pragma: no cover
         """Aktualisiert die Bildliste"""
         if not self.create_ui:
@@ -441,12 +539,10 @@ class ImageSelectorGUI:
 
             # Regions-Liste aktualisieren
             self.region_listbox.delete(0, tk.END)
-            for i, region in enumerate(self.regions, 1):
-                coords = region["coords"]
-                mode = region["mode"]
-                x1, y1, x2, y2 = coords
-                list_text = f"{i}. {mode.upper()} ({int(x2 - x1)}x{int(y2 - y1)})"
-                self.region_listbox.insert(tk.END, list_text)
+            labels = self.format_region_labels(self.regions)
+            if labels:
+                # Ein einziger Tcl-Aufruf statt eines insert() pro Region
+                self.region_listbox.insert(tk.END, *labels)
 
             # Bildliste und Navigation aktualisieren
             self._update_image_list()
@@ -558,7 +654,7 @@ class ImageSelectorGUI:
 🎯 MODI
 
 • FOTO: Für Bildausschnitte (blaue Markierung)
-  → Export als PNG-Datei
+  → Export als PNG-Datei (JPEG bei JPEG-Quellbildern)
 
 • TEXT: Für Textbereiche (grüne Markierung)
   → Export als PNG + TXT-Datei (Template)
@@ -566,7 +662,7 @@ class ImageSelectorGUI:
 
 📁 DATEINAMEN
 
-Format: bildname_timestamp_regionXX_modus.png
+Format: bildname_timestamp_regionXX_modus.png (bzw. .jpg)
 
 Beispiel:
   dokument1_20250122_143022_region01_foto.png
@@ -736,8 +832,7 @@ MIT License
 
         self.regions.append(region)
 
-        x1, y1, x2, y2 = self.current_selection
-        list_text = f"{len(self.regions)}. {mode.upper()} ({int(x2 - x1)}x{int(y2 - y1)})"
+        list_text = self.format_region_labels([region], start=len(self.regions))[0]
         self.region_listbox.insert(tk.END, list_text)
 
         self.status_bar.config(
@@ -773,16 +868,18 @@ MIT License
         if not self.original_image:
             return
 
-        # PIL rotate ist gegen den Uhrzeigersinn, aber expand=True passt die Größe an
-        # Für 90° rechts nutzen wir -90
+        # transpose() kopiert nur Pixel um (keine Interpolation wie bei rotate()).
+        # Ein Umweg über np.rot90 ist nicht schneller: asarray(), ascontiguousarray()
+        # und fromarray() kopieren das Bild zusätzlich (gemessen ~3-4x langsamer).
+        # Die ROTATE_*-Konstanten drehen gegen den Uhrzeigersinn
         if angle == 90:
-            # 90° rechts = -90° in PIL (oder 270° gegen Uhrzeigersinn)
-            self.original_image = self.original_image.rotate(-90, expand=True)
+            # 90° rechts = 270° gegen Uhrzeigersinn
+            self.original_image = self.original_image.transpose(Image.Transpose.ROTATE_270)
         elif angle == -90:
-            # 90° links = 90° in PIL
-            self.original_image = self.original_image.rotate(90, expand=True)
+            # 90° links = 90° gegen Uhrzeigersinn
+            self.original_image = self.original_image.transpose(Image.Transpose.ROTATE_90)
         elif angle == 180:
-            self.original_image = self.original_image.rotate(180, expand=True)
+            self.original_image = self.original_image.transpose(Image.Transpose.ROTATE_180)
 
         # Clear current selection and regions when rotating
         # Only access GUI elements if create_ui is True
@@ -811,14 +908,7 @@ MIT License
             rotation_text = "90° rechts" if angle == 90 else ("90° links" if angle == -90 else "180°")
             self.status_bar.config(text=f"Bild um {rotation_text} gedreht - Bereiche wurden zurückgesetzt")
         else:
-            # Update scale factor and resized image for non-GUI mode
-            img_width, img_height = self.original_image.size
-            canvas_width = 1600  # 25% größer als 1280
-            canvas_height = 1280  # 25% größer als 1024
-            self.scale_factor = self.compute_scale(img_width, img_height, canvas_width, canvas_height)
-            new_width = int(img_width * self.scale_factor)
-            new_height = int(img_height * self.scale_factor)
-            self.image = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            self._update_headless_image()
 
     def finish_selection(self):  # pragma: no cover
         """Beendet die Auswahl und exportiert"""
@@ -0,0 +1,154 @@
+"""
+Persistenter Cache für dekodierte Bilder (Rohdaten + JSON-Sidecar)
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Modi, deren Rohdaten ohne Palette o.ä. verlustfrei über tobytes()/frombuffer() gehen
+CACHEABLE_MODES = ("L", "RGB", "RGBA", "CMYK")
+
+# Obergrenze für die Rohdaten im Cache-Verzeichnis; darüber werden die am
+# längsten nicht genutzten Einträge gelöscht
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+
+def _decoded_cache_path(path: str, cache_dir: str) -> str:
+    """Gibt den Pfad der Rohdaten-Datei im Cache für ein Quellbild zurück"""
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.raw")
+
+
+def _read_sidecar(meta_path: str) -> dict:
+    """Liest die Metadaten eines Cache-Eintrags, leeres Dict falls nicht vorhanden"""
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _prune_cache(cache_dir: str, max_bytes: int):
+    """Löscht die am längsten nicht genutzten Einträge, bis die Rohdaten max_bytes unterschreiten"""
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".raw") and entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, raw_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            # Sidecar zuerst entfernen, damit kein Eintrag auf fehlende Rohdaten zeigt
+            meta_path = os.path.splitext(raw_path)[0] + ".json"
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            os.remove(raw_path)
+            total -= size
+        except OSError as e:
+            logger.warning("Fehler beim Löschen des Cache-Eintrags %s: %s", raw_path, e)
+
+
+def _replace_file(path: str, data: bytes):
+    """Schreibt data in eine temporäre Datei und ersetzt path atomar per os.replace().
+
+    path wird nie in-place gekürzt: Bilder, die per mmap auf die alte Datei zeigen,
+    behalten ihren (alten) Inode statt beim nächsten Pixelzugriff mit SIGBUS abzustürzen.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_cache(img: Image.Image, raw_path: str, meta: dict):
+    """Schreibt Rohdaten und Sidecar; das Sidecar zuletzt, damit es nur gültige Einträge beschreibt"""
+    meta_path = os.path.splitext(raw_path)[0] + ".json"
+    try:
+        os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        _replace_file(raw_path, img.tobytes())
+        _replace_file(meta_path, json.dumps(meta).encode("utf-8"))
+    except OSError as e:
+        logger.warning("Fehler beim Schreiben des Bild-Caches %s: %s", raw_path, e)
+
+
+def load_image_cached(
+    path: str, cache_dir: str, source_path: str = None, max_bytes: int = MAX_CACHE_BYTES
+) -> Image.Image:
+    """Lädt ein Bild, bei unveränderter Quelldatei direkt aus dem Rohdaten-Cache.
+
+    Der Cache-Eintrag ist an Pfad, mtime und Dateigröße der Quelle gebunden und
+    wird bei Abweichung neu geschrieben. Treffer werden per mmap eingelesen,
+    ohne das Bild erneut zu dekodieren.
+
+    Args:
+        path: Pfad zum Quellbild
+        cache_dir: Verzeichnis für die Cache-Dateien (z.B. tmp/.cache)
+        source_path: Optional - Datei, aus der path erzeugt wurde (z.B. das PDF bei
+            extrahierten Seiten, die bei jedem Öffnen neu geschrieben werden);
+            der Eintrag wird dann an diese Datei gebunden. Standard: path
+        max_bytes: Obergrenze für die Rohdaten im Cache-Verzeichnis
+
+    Returns:
+        Vollständig geladenes PIL Image
+    """
+    if source_path is None:
+        source_path = path
+    st = os.stat(source_path)
+    raw_path = _decoded_cache_path(source_path, cache_dir)
+    meta = _read_sidecar(os.path.splitext(raw_path)[0] + ".json")
+
+    expected = (st.st_mtime, st.st_size, os.path.basename(path))
+    if (meta.get("mtime"), meta.get("size"), meta.get("image")) == expected:
+        try:
+            with open(raw_path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            mode = meta["mode"]
+            img = Image.frombuffer(mode, (meta["width"], meta["height"]), buf, "raw", mode, 0, 1)
+            # Format der Quelle beibehalten, wie bei Image.open()
+            img.format = meta.get("format")
+            # mtime als Zeitpunkt der letzten Nutzung für die Verdrängung
+            os.utime(raw_path)
+            return img
+        except (OSError, ValueError, KeyError):
+            pass
+
+    img = Image.open(path)
+    img.load()
+
+    if img.mode in CACHEABLE_MODES:
+        _write_cache(img, raw_path, {
+            "path": os.path.abspath(source_path),
+            "image": os.path.basename(path),
+            "mtime": st.st_mtime,
+            "size": st.st_size,
+            "width": img.width,
+            "height": img.height,
+            "mode": img.mode,
+            "format": img.format,
+        })
+        _prune_cache(cache_dir, max_bytes)
+
+    return img
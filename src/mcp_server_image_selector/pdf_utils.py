@@ -2,22 +2,41 @@
 PDF-Utility-Funktionen für die Bildextraktion
 """
 
+import logging
 import os
-import sys
 from typing import Optional
+from PIL import Image
 
 try:
     import fitz  # PyMuPDF
 except ImportError:
     fitz = None
 
+logger = logging.getLogger(__name__)
 
-def extract_image_from_pdf(pdf_path: str) -> Optional[str]:
+
+# Eingebettete Bilder ab dieser Kantenlänge (px) werden direkt übernommen;
+# kleinere (Logos, Icons) gelten nicht als Seiteninhalt -> Seite rendern
+MIN_EMBEDDED_IMAGE_SIZE = 1024
+
+# Auflösung für das Rendern der Seite, wenn kein passendes Bild eingebettet ist
+RENDER_DPI = 150
+
+
+def extract_image_from_pdf(
+    pdf_path: str, min_image_size: int = MIN_EMBEDDED_IMAGE_SIZE, dpi: int = RENDER_DPI
+) -> Optional[str]:
     """
     Extrahiert das erste Bild aus einem PDF oder erstellt ein Rendering der ersten Seite.
 
+    Eingebettete Bilder werden bevorzugt und ohne Neukodierung übernommen; gerendert
+    wird nur, wenn die erste Seite kein Bild mit mindestens min_image_size Pixeln
+    Kantenlänge enthält.
+
     Args:
         pdf_path: Pfad zur PDF-Datei
+        min_image_size: Minimale Kantenlänge (px) eines eingebetteten Bildes
+        dpi: Auflösung für das Rendern der Seite
 
     Returns:
         Pfad zum extrahierten Bild oder None bei Fehler
@@ -28,43 +47,49 @@ def extract_image_from_pdf(pdf_path: str) -> Optional[str]:
         raise ImportError("PyMuPDF (fitz) ist nicht installiert. Bitte installieren: pip install PyMuPDF")
 
     try:
-        doc = fitz.open(pdf_path)
-        if len(doc) == 0:
-            return None
+        with fitz.open(pdf_path) as doc:
+            if len(doc) == 0:
+                return None
 
-        page = doc[0]  # Erste Seite
+            page = doc[0]  # Erste Seite
 
-        # Versuche zunächst, eingebettete Bilder zu extrahieren
-        image_list = page.get_images(full=True)
+            output_dir = create_tmp_dir_if_needed()
+            base_name = os.path.splitext(os.path.basename(pdf_path))[0]
 
-        output_dir = create_tmp_dir_if_needed()
-        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+            # Versuche zunächst, eingebettete Bilder zu extrahieren; Breite/Höhe stehen
+            # bereits in der Bildliste, dekodiert wird nur das gewählte Bild
+            xref = None
+            for image_info in page.get_images(full=False):
+                width, height = image_info[2], image_info[3]
+                if max(width, height) >= min_image_size:
+                    xref = image_info[0]
+                    break
 
-        if image_list:
-            # Nimm das erste Bild
-            xref = image_list[0][0]
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
+            if xref is not None:
+                base_image = doc.extract_image(xref)
+                image_bytes = base_image["image"]
 
-            output_path = os.path.join(output_dir, f"{base_name}_extracted.png")
+                # Originalformat beibehalten (z.B. JPEG aus Scans)
+                output_path = os.path.join(output_dir, f"{base_name}_extracted.{base_image['ext']}")
 
-            with open(output_path, "wb") as img_file:
-                img_file.write(image_bytes)
+                with open(output_path, "wb") as img_file:
+                    img_file.write(image_bytes)
 
-            doc.close()
-            return output_path
-        else:
-            # Kein eingebettetes Bild gefunden - rendere die Seite als Bild
-            # Hohe Auflösung für bessere Qualität
-            mat = fitz.Matrix(2.0, 2.0)  # 2x Zoom = 144 DPI
-            pix = page.get_pixmap(matrix=mat)
+                return output_path
+
+            # Kein (ausreichend großes) eingebettetes Bild gefunden - rendere die Seite als Bild
+            pix = page.get_pixmap(dpi=dpi, alpha=False)
+
+            # Pixmap-Samples direkt an PIL übergeben. Das Rendering ist die Quelle für
+            # Export und OCR (meist Textseiten) -> verlustfrei als PNG, mit schneller
+            # Kompressionsstufe statt JPEG (Artefakte an Glyphenkanten)
+            img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", pix.stride, 1)
 
             output_path = os.path.join(output_dir, f"{base_name}_rendered.png")
 
-            pix.save(output_path)
-            doc.close()
+            img.save(output_path, "PNG", compress_level=1)
             return output_path
 
     except Exception as e:
-        print(f"Fehler beim Extrahieren des Bildes aus PDF: {e}", file=sys.stderr)
+        logger.warning("Fehler beim Extrahieren des Bildes aus PDF: %s", e)
         return None
@@ -10,8 +10,9 @@ import sys
 
 # Lokale Imports
 from .gui import ImageSelectorGUI
-from .utils import get_working_dir, create_tmp_dir_if_needed, transform_coords
-from .export import export_regions
+from .utils import get_working_dir, create_tmp_dir_if_needed
+# export_regions bleibt für bestehende Aufrufer auch über server importierbar
+from .export import export_regions, export_regions_multi  # noqa: F401
 
 # MCP imports
 try:
@@ -34,6 +35,11 @@ except Exception:
 if Server is not None and getattr(Server, "__name__", "") != "object":
     app = Server("image-selector")
 
+    # Verzeichnisse werden einmalig beim Start (main) bzw. bei der ersten Verwendung
+    # aufgelöst - der Import des Moduls legt keine Verzeichnisse an
+    WORKING_DIR = None
+    TMP_DIR = None
+
     @app.list_tools()
     async def list_tools() -> List[Any]:
         """Liste verfügbarer Tools"""
@@ -76,120 +82,125 @@ if Server is not None and getattr(Server, "__name__", "") != "object":
 
 
 if 'app' in globals():
-    @app.call_tool()
-    async def call_tool(name: str, arguments: dict) -> List[Any]:
-        """Tool-Aufrufe verarbeiten"""
-
-        working_dir = get_working_dir()
-        export_dir = create_tmp_dir_if_needed()
-
-        if name == "get_working_directory":
-            return [TextContent(type="text", text=f"Working Directory: {working_dir}")]
-
-        elif name == "list_exported_regions":
-            files = []
-            for file in os.listdir(export_dir):
-                if file.endswith((".png", ".txt")):
-                    files.append(file)
-
-            files.sort()
-
-            result = f"Exportierte Dateien in {export_dir}:\n\n"
-            if files:
-                result += "\n".join(f"  - {f}" for f in files)
-            else:
-                result += "  (keine Dateien gefunden)"
-
-            return [TextContent(type="text", text=result)]
-
-        elif name == "select_image_regions":
-            image_path = arguments.get("image_path")
+    def _resolve_dirs():
+        """Löst WORKING_DIR/TMP_DIR einmalig auf (ändern sich während der Laufzeit nicht)"""
+        global WORKING_DIR, TMP_DIR
+        if WORKING_DIR is None:
+            WORKING_DIR = get_working_dir()
+            TMP_DIR = create_tmp_dir_if_needed()
+
+    def _ensure_tmp_dir() -> str:
+        """Gibt TMP_DIR zurück und legt es neu an, falls es seit dem Start gelöscht wurde"""
+        _resolve_dirs()
+        os.makedirs(TMP_DIR, exist_ok=True)
+        return TMP_DIR
+
+    def _handle_get_working_directory(arguments: dict) -> List[Any]:
+        """Tool get_working_directory"""
+        _resolve_dirs()
+        return [TextContent(type="text", text=f"Working Directory: {WORKING_DIR}")]
+
+    def _handle_list_exported_regions(arguments: dict) -> List[Any]:
+        """Tool list_exported_regions"""
+        with os.scandir(_ensure_tmp_dir()) as entries:
+            files = sorted(
+                entry.name for entry in entries
+                if entry.name.endswith((".png", ".jpg", ".txt")) and entry.is_file()
+            )
+
+        result = f"Exportierte Dateien in {TMP_DIR}:\n\n"
+        if files:
+            result += "\n".join(f"  - {f}" for f in files)
+        else:
+            result += "  (keine Dateien gefunden)"
 
-            if not image_path:
-                return [TextContent(type="text", text="Fehler: image_path erforderlich")]
+        return [TextContent(type="text", text=result)]
 
-            # Relativen Pfad auflösen
-            if not os.path.isabs(image_path):
-                image_path = os.path.join(working_dir, image_path)
+    def _handle_select_image_regions(arguments: dict) -> List[Any]:
+        """Tool select_image_regions"""
+        image_path = arguments.get("image_path")
 
-            if not os.path.exists(image_path):
-                return [
-                    TextContent(
-                        type="text", text=f"Fehler: Bild nicht gefunden: {image_path}"
+        if not image_path:
+            return [TextContent(type="text", text="Fehler: image_path erforderlich")]
+
+        # Relativen Pfad auflösen
+        _resolve_dirs()
+        if not os.path.isabs(image_path):
+            image_path = os.path.join(WORKING_DIR, image_path)
+
+        if not os.path.exists(image_path):
+            return [
+                TextContent(
+                    type="text", text=f"Fehler: Bild nicht gefunden: {image_path}"
+                )
+            ]
+
+        # GUI in separatem Thread starten (Tkinter braucht Main-Thread)
+        # Für MCP verwenden wir einen synchronen Ansatz
+        try:
+            # PDF-Extraktion und Export schreiben nach TMP_DIR
+            gui = ImageSelectorGUI(image_path, _ensure_tmp_dir())
+            images_data = gui.run()
+
+            if images_data:
+                # Exportiere alle Regionen von allen Bildern (gemeinsamer Zeitstempel und Thread-Pool)
+                result = export_regions_multi(images_data, TMP_DIR)
+                all_exported_files = result["files"]
+                total_exported = result["exported_count"]
+
+                if total_exported > 0:
+                    response = (
+                        f"✓ Erfolgreich {total_exported} Bereiche von {len(images_data)} Bild(ern) exportiert:\n\n"
                     )
-                ]
-
-            # GUI in separatem Thread starten (Tkinter braucht Main-Thread)
-            # Für MCP verwenden wir einen synchronen Ansatz
-            try:
-                gui = ImageSelectorGUI(image_path, export_dir)
-                images_data = gui.run()
-
-                if images_data:
-                    # Exportiere alle Regionen von allen Bildern
-                    all_exported_files = []
-                    total_exported = 0
-
-                    for img_data in images_data:
-                        if img_data['regions']:
-                            # Koordinaten umrechnen
-                            for region in img_data['regions']:
-                                region["coords"] = transform_coords(
-                                    region["coords"],
-                                    img_data['scale_factor']
-                                )
-
-                            # Export für dieses Bild
-                            result = export_regions(
-                                img_data['original_path'],
-                                img_data['regions'],
-                                export_dir,
-                                image_object=img_data['original_image']
+                    for file_info in all_exported_files:
+                        if file_info["type"] == "foto":
+                            response += f"  Region {file_info['region']} (FOTO): {os.path.basename(file_info['file'])}\n"
+                        else:
+                            response += f"  Region {file_info['region']} (TEXT):\n"
+                            response += (
+                                f"    - Bild: {os.path.basename(file_info['image_file'])}\n"
+                            )
+                            response += (
+                                f"    - Text: {os.path.basename(file_info['text_file'])}\n"
                             )
 
-                            all_exported_files.extend(result["files"])
-                            total_exported += result["exported_count"]
+                    response += f"\nAusgabeverzeichnis: {TMP_DIR}"
 
-                    if total_exported > 0:
-                        response = (
-                            f"✓ Erfolgreich {total_exported} Bereiche von {len(images_data)} Bild(ern) exportiert:\n\n"
-                        )
-                        for file_info in all_exported_files:
-                            if file_info["type"] == "foto":
-                                response += f"  Region {file_info['region']} (FOTO): {os.path.basename(file_info['file'])}\n"
-                            else:
-                                response += f"  Region {file_info['region']} (TEXT):\n"
-                                response += (
-                                    f"    - Bild: {os.path.basename(file_info['image_file'])}\n"
-                                )
-                                response += (
-                                    f"    - Text: {os.path.basename(file_info['text_file'])}\n"
-                                )
-
-                        response += f"\nAusgabeverzeichnis: {export_dir}"
-
-                        return [TextContent(type="text", text=response)]
-                    else:
-                        return [
-                            TextContent(
-                                type="text",
-                                text="Keine Bereiche zum Exportieren ausgewählt",
-                            )
-                        ]
+                    return [TextContent(type="text", text=response)]
                 else:
                     return [
                         TextContent(
                             type="text",
-                            text="Auswahl abgebrochen - keine Bereiche exportiert",
+                            text="Keine Bereiche zum Exportieren ausgewählt",
                         )
                     ]
-
-            except Exception as e:
+            else:
                 return [
-                    TextContent(type="text", text=f"Fehler beim Öffnen der GUI: {str(e)}")
+                    TextContent(
+                        type="text",
+                        text="Auswahl abgebrochen - keine Bereiche exportiert",
+                    )
                 ]
 
-        return [TextContent(type="text", text=f"Unbekanntes Tool: {name}")]
+        except Exception as e:
+            return [
+                TextContent(type="text", text=f"Fehler beim Öffnen der GUI: {str(e)}")
+            ]
+
+    # Tool-Name -> Handler (statt if/elif-Kette in call_tool)
+    TOOL_HANDLERS = {
+        "get_working_directory": _handle_get_working_directory,
+        "list_exported_regions": _handle_list_exported_regions,
+        "select_image_regions": _handle_select_image_regions,
+    }
+
+    @app.call_tool()
+    async def call_tool(name: str, arguments: dict) -> List[Any]:
+        """Tool-Aufrufe verarbeiten"""
+        handler = TOOL_HANDLERS.get(name)
+        if handler is None:
+            return [TextContent(type="text", text=f"Unbekanntes Tool: {name}")]
+        return handler(arguments)
 
 
 async def main():
@@ -200,6 +211,8 @@ async def main():
         print("  pip install mcp", file=sys.stderr)
         sys.exit(1)
 
+    _resolve_dirs()
+
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await app.run(read_stream, write_stream, app.create_initialization_options())
 
@@ -264,29 +277,10 @@ def run_standalone(image_path: str = None):
         images_data = gui.run()
 
         if images_data:
-            # Exportiere alle Regionen von allen Bildern
-            all_exported_files = []
-            total_exported = 0
-
-            for img_data in images_data:
-                if img_data['regions']:
-                    # Koordinaten umrechnen
-                    for region in img_data['regions']:
-                        region["coords"] = transform_coords(
-                            region["coords"],
-                            img_data['scale_factor']
-                        )
-
-                    # Export für dieses Bild
-                    result = export_regions(
-                        img_data['original_path'],
-                        img_data['regions'],
-                        export_dir,
-                        image_object=img_data['original_image']
-                    )
-
-                    all_exported_files.extend(result["files"])
-                    total_exported += result["exported_count"]
+            # Exportiere alle Regionen von allen Bildern (gemeinsamer Zeitstempel und Thread-Pool)
+            result = export_regions_multi(images_data, export_dir)
+            all_exported_files = result["files"]
+            total_exported = result["exported_count"]
 
             if total_exported > 0:
                 print(f"\n✓ Erfolgreich {total_exported} Bereiche von {len(images_data)} Bild(ern) exportiert:\n")
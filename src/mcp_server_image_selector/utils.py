@@ -2,36 +2,75 @@
 Utility-Funktionen für Dateioperationen und Verzeichnisverwaltung
 """
 
+import functools
+import logging
 import os
-import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
+logger = logging.getLogger(__name__)
+
+# Ab dieser Anzahl Regionen rechnet transform_coords_bulk vektorisiert (falls NumPy verfügbar)
+BULK_THRESHOLD = 16
+
+# Erst ab dieser Anzahl den optionalen Numba-Kernel verwenden: Import von numba/llvmlite
+# plus erstes Laden des Kernels kosten einmalig ~0.4 s, der Kernel spart gegenüber NumPy
+# nur wenige ns pro Region
+JIT_THRESHOLD = 1_000_000
+
+
+@functools.lru_cache(maxsize=1)
 def get_working_dir() -> str:
-    """Ermittelt das Working Directory"""
+    """Ermittelt das Working Directory (einmal pro Prozess, siehe reset_working_dir_cache)"""
     # Aus Umgebungsvariable oder aktuelles Verzeichnis
     working_dir = os.environ.get("IMAGE_SELECTOR_WORKING_DIR", os.getcwd())
-    os.makedirs(working_dir, exist_ok=True)
+    if not os.path.isdir(working_dir):
+        os.makedirs(working_dir, exist_ok=True)
     return working_dir
 
 
+@functools.lru_cache(maxsize=1)
 def create_tmp_dir_if_needed() -> str:
     """Erstellt ein temporäres Verzeichnis, falls nötig"""
     tmp_dir = os.path.join(get_working_dir(), "tmp")
-    os.makedirs(tmp_dir, exist_ok=True)
+    if not os.path.isdir(tmp_dir):
+        os.makedirs(tmp_dir, exist_ok=True)
     return tmp_dir
 
 
+def reset_working_dir_cache():
+    """Verwirft die gecachten Verzeichnisse, z.B. nach Änderung von IMAGE_SELECTOR_WORKING_DIR in Tests"""
+    get_working_dir.cache_clear()
+    create_tmp_dir_if_needed.cache_clear()
+
+
 def cleanup_tmp_dir():
     """Löscht das temporäre Verzeichnis, falls es nicht leer ist"""
     tmp_dir = create_tmp_dir_if_needed()
-    if os.path.exists(tmp_dir):
-        for file in os.listdir(tmp_dir):
-            file_path = os.path.join(tmp_dir, file)
+    # scandir liefert den Dateityp direkt aus readdir() - kein zusätzlicher stat() pro Eintrag
+    try:
+        entries = os.scandir(tmp_dir)
+    except FileNotFoundError:
+        # Pfad ist gecacht, das Verzeichnis kann zur Laufzeit gelöscht worden sein
+        os.makedirs(tmp_dir, exist_ok=True)
+        return
+    with entries:
+        for entry in entries:
             try:
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                print(f"Fehler beim Löschen der Datei {file_path}: {e}", file=sys.stderr)
+                if entry.is_file(follow_symlinks=False):
+                    os.remove(entry.path)
+            except OSError as e:
+                logger.warning("Fehler beim Löschen der Datei %s: %s", entry.path, e)
+
+
+@functools.lru_cache(maxsize=1)
+def _jit_kernel():
+    """Importiert den Numba-Kernel erst bei Bedarf; None, wenn numba nicht installiert ist"""
+    from ._fast import transform_coords_bulk as kernel
+    return kernel
 
 
 def transform_coords(coords: tuple, scale_factor: float) -> tuple:
@@ -39,4 +78,22 @@ def transform_coords(coords: tuple, scale_factor: float) -> tuple:
     x1, y1, x2, y2 = coords
     if scale_factor == 0:
         raise ValueError("scale_factor must be non-zero")
+    # Echte Division statt Multiplikation mit 1/scale_factor: der Kehrwert rundet
+    # bei ganzzahligen Ergebnissen (Auswahl bis zum Bildrand) teils knapp darunter
     return (int(x1 / scale_factor), int(y1 / scale_factor), int(x2 / scale_factor), int(y2 / scale_factor))
+
+
+def transform_coords_bulk(coords_list: list, scale_factor: float) -> list:
+    """Transformiert die Koordinaten mehrerer Regionen mit demselben scale_factor."""
+    if scale_factor == 0:
+        raise ValueError("scale_factor must be non-zero")
+    if np is not None and len(coords_list) > BULK_THRESHOLD:
+        coords_array = np.asarray(coords_list, dtype=np.float64)
+        kernel = _jit_kernel() if len(coords_list) > JIT_THRESHOLD else None
+        if kernel is not None:
+            scaled = kernel(coords_array, float(scale_factor))
+        else:
+            # astype() schneidet wie int() in Richtung 0 ab
+            scaled = (coords_array / scale_factor).astype(np.int64)
+        return [tuple(row) for row in scaled.tolist()]
+    return [transform_coords(coords, scale_factor) for coords in coords_list]
@@ -0,0 +1,45 @@
+import sys
+import types
+from pathlib import Path
+
+import pytest  # type: ignore
+
+# Ensure the package in src/ is importable during tests
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+# Provide lightweight mocks for the external 'mcp' package so tests can run
+# without the real dependency installed (runs once per session).
+if "mcp" not in sys.modules:
+    _m = types.ModuleType("mcp")
+    _m_server = types.ModuleType("mcp.server")
+    setattr(_m_server, "Server", object)
+    _m_server_stdio = types.ModuleType("mcp.server.stdio")
+    _m_types = types.ModuleType("mcp.types")
+    setattr(_m_types, "Tool", object)
+    setattr(_m_types, "TextContent", object)
+    sys.modules["mcp"] = _m
+    sys.modules["mcp.server"] = _m_server
+    sys.modules["mcp.server.stdio"] = _m_server_stdio
+    sys.modules["mcp.types"] = _m_types
+
+# Warm up PyMuPDF once per test process (MuPDF context, font cache), so the cold
+# start is not attributed to whichever PDF test runs first (e.g. per xdist worker)
+try:
+    import fitz  # PyMuPDF
+
+    with fitz.open() as _doc:
+        _doc.new_page().get_pixmap()
+except Exception:
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _reset_working_dir_cache():
+    """get_working_dir() is cached per process; tests change the env var per test"""
+    from mcp_server_image_selector.utils import reset_working_dir_cache
+
+    reset_working_dir_cache()
+    yield
+    reset_working_dir_cache()
@@ -1,30 +1,8 @@
 import os
-import sys
-import types
 from PIL import Image
 import shutil
 
-# ensure src/ is importable
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-SRC = os.path.join(ROOT, "src")
-if SRC not in sys.path:
-    sys.path.insert(0, SRC)
-
-# lightweight mcp mocks (same approach as other tests)
-if "mcp" not in sys.modules:
-    _m = types.ModuleType("mcp")
-    _m_server = types.ModuleType("mcp.server")
-    setattr(_m_server, "Server", object)
-    _m_server_stdio = types.ModuleType("mcp.server.stdio")
-    _m_types = types.ModuleType("mcp.types")
-    setattr(_m_types, "Tool", object)
-    setattr(_m_types, "TextContent", object)
-    sys.modules["mcp"] = _m
-    sys.modules["mcp.server"] = _m_server
-    sys.modules["mcp.server.stdio"] = _m_server_stdio
-    sys.modules["mcp.types"] = _m_types
-
-from mcp_server_image_selector.export import export_regions
+from mcp_server_image_selector.export import export_regions, export_regions_multi
 
 
 def make_test_image(path, size=(200, 100), color=(255, 0, 0)):
@@ -58,3 +36,156 @@ def test_export_regions(tmp_path):
     # Cleanup
     shutil.rmtree(base_dir)
     assert not os.path.exists(base_dir)
+
+
+def test_export_regions_keeps_numbering_when_sorted(tmp_path):
+    base_dir = str(tmp_path)
+    img_path = os.path.join(base_dir, "test.png")
+    Image.new("RGB", (200, 100), (0, 0, 255)).save(img_path, "PNG")
+
+    # region 1 lies below region 2 - export order must not change numbering
+    regions = [
+        {"coords": (0, 60, 30, 90), "mode": "foto"},
+        {"coords": (0, 0, 50, 20), "mode": "foto"},
+    ]
+
+    result = export_regions(img_path, regions, base_dir)
+
+    assert [f["region"] for f in result["files"]] == [1, 2]
+    assert result["files"][0]["file"].endswith("_region01_foto.png")
+    with Image.open(result["files"][0]["file"]) as img:
+        assert img.size == (30, 30)
+    with Image.open(result["files"][1]["file"]) as img:
+        assert img.size == (50, 20)
+
+
+def test_export_regions_text_sidecar_content(tmp_path):
+    base_dir = str(tmp_path)
+    img_path = os.path.join(base_dir, "test.jpg")
+    make_test_image(img_path)
+
+    regions = [{"coords": (10, 10, 100, 80), "mode": "text"}]
+    result = export_regions(img_path, regions, base_dir)
+
+    info = result["files"][0]
+    with open(info["text_file"], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "Textbereich 1"
+    assert lines[1] == f"Bildquelle: {info['image_file']}"
+    assert lines[2] == f"Original: {img_path}"
+    assert lines[3] == ""
+    assert lines[4]
+
+
+def test_export_regions_foto_format_follows_source(tmp_path):
+    base_dir = str(tmp_path)
+    jpg_path = os.path.join(base_dir, "photo.jpg")
+    png_path = os.path.join(base_dir, "scan.png")
+    make_test_image(jpg_path)
+    Image.new("RGB", (200, 100), (0, 255, 0)).save(png_path, "PNG")
+
+    regions = [
+        {"coords": (10, 10, 100, 80), "mode": "foto"},
+        {"coords": (50, 20, 150, 90), "mode": "text"},
+    ]
+
+    jpg_result = export_regions(jpg_path, regions, base_dir)
+    foto, text = jpg_result["files"]
+    assert foto["file"].endswith("_foto.jpg")
+    with Image.open(foto["file"]) as img:
+        assert img.format == "JPEG"
+        assert img.size == (90, 70)
+    # Text-Bereiche bleiben für die OCR verlustfrei
+    assert text["image_file"].endswith("_text.png")
+
+    png_result = export_regions(png_path, regions[:1], base_dir)
+    assert png_result["files"][0]["file"].endswith("_foto.png")
+
+
+def test_export_regions_uses_given_timestamp(tmp_path):
+    base_dir = str(tmp_path)
+    img_path = os.path.join(base_dir, "test.png")
+    Image.new("RGB", (200, 100), (0, 0, 255)).save(img_path, "PNG")
+
+    regions = [{"coords": (10, 10, 100, 80), "mode": "foto"}]
+    result = export_regions(img_path, regions, base_dir, timestamp="20250101_120000")
+
+    assert os.path.basename(result["files"][0]["file"]) == "test_20250101_120000_region01_foto.png"
+
+
+def test_export_regions_reloads_changed_source(tmp_path):
+    base_dir = str(tmp_path)
+    img_path = os.path.join(base_dir, "test.png")
+    regions = [{"coords": (0, 0, 10, 10), "mode": "foto"}]
+
+    Image.new("RGB", (200, 100), (255, 0, 0)).save(img_path, "PNG")
+    first = export_regions(img_path, regions, base_dir, timestamp="20250101_000001")
+
+    Image.new("RGB", (200, 100), (0, 255, 0)).save(img_path, "PNG")
+    st = os.stat(img_path)
+    os.utime(img_path, (st.st_atime, st.st_mtime + 10))
+    second = export_regions(img_path, regions, base_dir, timestamp="20250101_000002")
+
+    with Image.open(first["files"][0]["file"]) as img:
+        assert img.getpixel((0, 0)) == (255, 0, 0)
+    with Image.open(second["files"][0]["file"]) as img:
+        assert img.getpixel((0, 0)) == (0, 255, 0)
+
+
+def test_export_regions_multi_scales_and_shares_timestamp(tmp_path):
+    base_dir = str(tmp_path)
+    red = Image.new("RGB", (200, 100), (255, 0, 0))
+    green = Image.new("RGB", (200, 100), (0, 255, 0))
+    images_data = [
+        {
+            "original_path": os.path.join(base_dir, "a.png"),
+            "original_image": red,
+            "scale_factor": 0.5,
+            "regions": [{"coords": (0, 0, 50, 25), "mode": "foto"}],
+        },
+        {
+            "original_path": os.path.join(base_dir, "b.png"),
+            "original_image": green,
+            "scale_factor": 1.0,
+            "regions": [],
+        },
+        {
+            "original_path": os.path.join(base_dir, "c.png"),
+            "original_image": green,
+            "scale_factor": 1.0,
+            "regions": [{"coords": (10, 10, 30, 30), "mode": "foto"}],
+        },
+    ]
+
+    result = export_regions_multi(images_data, base_dir, timestamp="20250101_120000")
+
+    assert result["exported_count"] == 2
+    names = [os.path.basename(f["file"]) for f in result["files"]]
+    assert names == ["a_20250101_120000_region01_foto.png", "c_20250101_120000_region01_foto.png"]
+    with Image.open(result["files"][0]["file"]) as img:
+        assert img.size == (100, 50)
+    # Display-Koordinaten der Eingabe bleiben unverändert
+    assert images_data[0]["regions"][0]["coords"] == (0, 0, 50, 25)
+
+
+def test_export_regions_from_pil_only(tmp_path):
+    # Export logic only: in-memory image, the source path is never read
+    base_dir = str(tmp_path)
+    img = Image.new("RGB", (400, 300), (0, 255, 0))
+    fake_path = os.path.join(base_dir, "not_there.pdf")
+
+    regions = [
+        {"coords": (10, 10, 100, 80), "mode": "foto"},
+        {"coords": (50, 20, 150, 100), "mode": "text"},
+    ]
+    result = export_regions(fake_path, regions, base_dir, image_object=img)
+
+    assert result["exported_count"] == 2
+    foto, text = result["files"]
+    assert os.path.basename(foto["file"]).startswith("not_there_")
+    with Image.open(foto["file"]) as exported:
+        assert exported.size == (90, 70)
+        assert exported.getpixel((0, 0)) == (0, 255, 0)
+    with Image.open(text["image_file"]) as exported:
+        assert exported.size == (100, 80)
+    assert os.path.exists(text["text_file"])
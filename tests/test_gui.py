@@ -16,3 +16,13 @@ def test_compute_scale_large_image():
     # image larger than canvas -> scale < 1.0
     scale = ImageSelectorGUI.compute_scale(2000, 1500, 800, 600)
     assert 0 < scale < 1.0
+
+
+def test_format_region_labels():
+    regions = [
+        {"coords": (10, 10, 110.6, 60), "mode": "foto"},
+        {"coords": (0, 0, 20, 30), "mode": "text"},
+    ]
+    labels = ImageSelectorGUI.format_region_labels(regions)
+    assert labels == ["1. FOTO (100x50)", "2. TEXT (20x30)"]
+    assert ImageSelectorGUI.format_region_labels(regions[1:], start=5) == ["5. TEXT (20x30)"]
@@ -0,0 +1,121 @@
+"""
+Tests für den persistenten Bild-Cache (image_cache.py)
+"""
+
+import os
+from PIL import Image
+from mcp_server_image_selector import image_cache
+from mcp_server_image_selector.image_cache import load_image_cached, _decoded_cache_path
+
+
+def make_test_image(path, size=(40, 30), color=(255, 0, 0)):
+    Image.new("RGB", size, color).save(path, "PNG")
+
+
+def test_load_image_cached_writes_cache(tmp_path):
+    img_path = str(tmp_path / "test.png")
+    cache_dir = str(tmp_path / ".cache")
+    make_test_image(img_path)
+
+    img = load_image_cached(img_path, cache_dir)
+    assert img.size == (40, 30)
+    assert img.format == "PNG"
+
+    raw_path = _decoded_cache_path(img_path, cache_dir)
+    assert os.path.exists(raw_path)
+    assert os.path.exists(os.path.splitext(raw_path)[0] + ".json")
+
+
+def test_load_image_cached_hit_skips_decode(tmp_path, monkeypatch):
+    img_path = str(tmp_path / "test.png")
+    cache_dir = str(tmp_path / ".cache")
+    make_test_image(img_path, color=(0, 0, 255))
+    load_image_cached(img_path, cache_dir)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("Image.open should not be called on cache hit")
+
+    monkeypatch.setattr(image_cache.Image, "open", _fail)
+    img = load_image_cached(img_path, cache_dir)
+    assert img.size == (40, 30)
+    assert img.mode == "RGB"
+    assert img.format == "PNG"
+    assert img.getpixel((0, 0)) == (0, 0, 255)
+
+
+def test_load_image_cached_invalidates_on_change(tmp_path):
+    img_path = str(tmp_path / "test.png")
+    cache_dir = str(tmp_path / ".cache")
+    make_test_image(img_path)
+    load_image_cached(img_path, cache_dir)
+
+    make_test_image(img_path, size=(20, 10), color=(0, 255, 0))
+    st = os.stat(img_path)
+    os.utime(img_path, (st.st_atime, st.st_mtime + 10))
+
+    img = load_image_cached(img_path, cache_dir)
+    assert img.size == (20, 10)
+    assert img.getpixel((0, 0)) == (0, 255, 0)
+
+
+def test_load_image_cached_keys_on_source_path(tmp_path, monkeypatch):
+    # e.g. a page extracted from a PDF: rewritten on every open, the PDF is unchanged
+    source_path = str(tmp_path / "doc.pdf")
+    with open(source_path, "wb") as f:
+        f.write(b"%PDF-1.4")
+    img_path = str(tmp_path / "doc_rendered.png")
+    cache_dir = str(tmp_path / ".cache")
+
+    make_test_image(img_path, color=(0, 0, 255))
+    load_image_cached(img_path, cache_dir, source_path)
+
+    make_test_image(img_path, color=(0, 0, 255))
+    st = os.stat(img_path)
+    os.utime(img_path, (st.st_atime, st.st_mtime + 10))
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("Image.open should not be called on cache hit")
+
+    monkeypatch.setattr(image_cache.Image, "open", _fail)
+    img = load_image_cached(img_path, cache_dir, source_path)
+    assert img.getpixel((0, 0)) == (0, 0, 255)
+
+
+def test_load_image_cached_evicts_least_recently_used(tmp_path):
+    cache_dir = str(tmp_path / ".cache")
+    paths = []
+    for i in range(3):
+        img_path = str(tmp_path / f"test{i}.png")
+        make_test_image(img_path)
+        paths.append(img_path)
+
+    entry_size = 40 * 30 * 3
+    load_image_cached(paths[0], cache_dir, max_bytes=2 * entry_size)
+    load_image_cached(paths[1], cache_dir, max_bytes=2 * entry_size)
+    # test0 becomes the oldest entry
+    os.utime(_decoded_cache_path(paths[0], cache_dir), (0, 0))
+    load_image_cached(paths[2], cache_dir, max_bytes=2 * entry_size)
+
+    assert not os.path.exists(_decoded_cache_path(paths[0], cache_dir))
+    assert not os.path.exists(os.path.splitext(_decoded_cache_path(paths[0], cache_dir))[0] + ".json")
+    assert os.path.exists(_decoded_cache_path(paths[1], cache_dir))
+    assert os.path.exists(_decoded_cache_path(paths[2], cache_dir))
+
+
+def test_load_image_cached_rewrite_keeps_held_image_readable(tmp_path):
+    # "L" hits are mapped zero-copy from the .raw file; rewriting the entry must not
+    # truncate that file in place (SIGBUS on the next pixel access)
+    img_path = str(tmp_path / "scan.png")
+    cache_dir = str(tmp_path / ".cache")
+    Image.new("L", (2000, 2000), 200).save(img_path, "PNG")
+    load_image_cached(img_path, cache_dir)
+    held = load_image_cached(img_path, cache_dir)
+
+    Image.new("L", (1000, 1000), 50).save(img_path, "PNG")
+    st = os.stat(img_path)
+    os.utime(img_path, (st.st_atime, st.st_mtime + 10))
+    fresh = load_image_cached(img_path, cache_dir)
+
+    assert held.getpixel((1999, 1999)) == 200
+    assert fresh.size == (1000, 1000)
+    assert fresh.getpixel((0, 0)) == 50
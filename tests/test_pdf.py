@@ -1,27 +1,11 @@
+import functools
 import os
+import shutil
 import sys
-import types
-from PIL import Image
+from pathlib import Path
 
-# ensure src/ is importable
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-SRC = os.path.join(ROOT, "src")
-if SRC not in sys.path:
-    sys.path.insert(0, SRC)
-
-# lightweight mcp mocks (same approach as other tests)
-if "mcp" not in sys.modules:
-    _m = types.ModuleType("mcp")
-    _m_server = types.ModuleType("mcp.server")
-    setattr(_m_server, "Server", object)
-    _m_server_stdio = types.ModuleType("mcp.server.stdio")
-    _m_types = types.ModuleType("mcp.types")
-    setattr(_m_types, "Tool", object)
-    setattr(_m_types, "TextContent", object)
-    sys.modules["mcp"] = _m
-    sys.modules["mcp.server"] = _m_server
-    sys.modules["mcp.server.stdio"] = _m_server_stdio
-    sys.modules["mcp.types"] = _m_types
+import pytest  # type: ignore
+from PIL import Image
 
 from mcp_server_image_selector.pdf_utils import extract_image_from_pdf
 from mcp_server_image_selector.gui import ImageSelectorGUI
@@ -33,35 +17,53 @@ try:
 except ImportError:
     PYMUPDF_AVAILABLE = False
 
+pytestmark = pytest.mark.skipif(not PYMUPDF_AVAILABLE, reason="PyMuPDF not installed")
 
-def create_test_pdf_with_image(pdf_path, image_size=(400, 300), image_color=(0, 0, 255)):
-    """Creates a simple PDF with an embedded image using PyMuPDF."""
-    if not PYMUPDF_AVAILABLE:
-        return False
+# A4 page with two lines of text, generated once with PyMuPDF (page.insert_text)
+TEXT_ONLY_PDF = os.path.join(os.path.dirname(__file__), "fixtures", "text_only.pdf")
 
-    try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+# Page renders in the tests only need to exist - keep the bitmap small
+TEST_RENDER_DPI = 36
+
+
+@functools.lru_cache(maxsize=None)
+def _build_pdf_bytes(image_size, image_color):
+    """Builds a one-page PDF with a solid-color image in memory (cached per size/color)."""
+    width, height = image_size
+    doc = fitz.open()
+    page = doc.new_page(width=width, height=height)
 
-        doc = fitz.open()
-        page = doc.new_page(width=image_size[0], height=image_size[1])
+    # Pixmap directly from raw RGB samples - no temporary PNG on disk
+    pix = fitz.Pixmap(fitz.csRGB, width, height, bytes(image_color) * (width * height), 0)
+    page.insert_image(fitz.Rect(0, 0, width, height), pixmap=pix)
 
-        # Create a temporary image
-        temp_img = Image.new("RGB", image_size, image_color)
-        temp_img_path = pdf_path.replace(".pdf", "_temp.png")
-        temp_img.save(temp_img_path, "PNG")
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
 
-        # Insert the image into the PDF
-        page.insert_image(fitz.Rect(0, 0, image_size[0], image_size[1]), filename=temp_img_path)
 
-        # Save the PDF
-        doc.save(pdf_path)
-        doc.close()
+def _master_pdf(directory, image_size, image_color):
+    """Writes the cached PDF bytes once per directory/size/color and returns the path."""
+    master_path = os.path.join(
+        directory, "_master_{}x{}_{}.pdf".format(*image_size, "".join(f"{c:02x}" for c in image_color))
+    )
+    if not os.path.exists(master_path):
+        Path(master_path).write_bytes(_build_pdf_bytes(image_size, image_color))
+    return master_path
+
+
+def _link_or_copy(src, dst):
+    """Hard-links the read-only master PDF to dst, copies if linking is not possible."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
 
-        # Clean up temporary image
-        if os.path.exists(temp_img_path):
-            os.remove(temp_img_path)
 
+def create_test_pdf_with_image(pdf_path, image_size=(400, 300), image_color=(0, 0, 255)):
+    """Creates a simple PDF with an embedded image using PyMuPDF."""
+    try:
+        _link_or_copy(_master_pdf(os.path.dirname(pdf_path), tuple(image_size), tuple(image_color)), pdf_path)
         return True
     except Exception as e:
         print(f"Error creating test PDF: {e}")
@@ -69,38 +71,31 @@ def create_test_pdf_with_image(pdf_path, image_size=(400, 300), image_color=(0,
 
 
 def create_test_pdf_text_only(pdf_path):
-    """Creates a PDF with only text (no embedded images) using PyMuPDF."""
-    if not PYMUPDF_AVAILABLE:
-        return False
-
+    """Copies the pre-generated text-only PDF (no embedded images) to pdf_path."""
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
-
-        doc = fitz.open()
-        page = doc.new_page(width=595, height=842)  # A4 size
-
-        # Add some text
-        text = "This is a test PDF document\nwith multiple lines of text."
-        page.insert_text((50, 50), text, fontsize=14)
-
-        doc.save(pdf_path)
-        doc.close()
+        shutil.copyfile(TEXT_ONLY_PDF, pdf_path)
         return True
     except Exception as e:
         print(f"Error creating test PDF: {e}")
         return False
 
 
-def test_extract_image_from_pdf_with_embedded_image(tmp_path, monkeypatch):
-    """Test extraction of embedded image from PDF."""
-    if not PYMUPDF_AVAILABLE:
-        print("PyMuPDF not available, skipping test")
-        return
+@pytest.fixture(scope="module")
+def pdf_base(tmp_path_factory):
+    """Shared working directory for the PDF tests (file names are unique per test)
 
-    base_dir = str(tmp_path)
-    # Set up temporary working directory
-    monkeypatch.setenv("IMAGE_SELECTOR_WORKING_DIR", base_dir)
+    IMAGE_SELECTOR_WORKING_DIR points here for the whole module.
+    """
+    base = tmp_path_factory.mktemp("pdf_tests")
+    mp = pytest.MonkeyPatch()
+    mp.setenv("IMAGE_SELECTOR_WORKING_DIR", str(base))
+    yield base
+    mp.undo()
+
+
+def test_extract_image_from_pdf_with_embedded_image(pdf_base):
+    """Test extraction of embedded image from PDF."""
+    base_dir = str(pdf_base)
 
     pdf_path = os.path.join(base_dir, "test_with_image.pdf")
 
@@ -110,29 +105,22 @@ def test_extract_image_from_pdf_with_embedded_image(tmp_path, monkeypatch):
         print("Failed to create test PDF, skipping test")
         return
 
-    # Extract the image
-    extracted_path = extract_image_from_pdf(pdf_path)
+    # Extract the image (the test image is below the default size threshold)
+    extracted_path = extract_image_from_pdf(pdf_path, min_image_size=0)
 
     # Verify the extraction
     assert extracted_path is not None, "Failed to extract image from PDF"
     assert os.path.exists(extracted_path), f"Extracted image does not exist at {extracted_path}"
+    assert "_extracted." in extracted_path, "Embedded image should be extracted, not rendered"
 
     # Verify it's a valid image
-    img = Image.open(extracted_path)
-    assert img is not None, "Extracted file is not a valid image"
-    assert img.size[0] > 0 and img.size[1] > 0, "Extracted image has invalid dimensions"
-    img.close()  # Close the image handle
+    with Image.open(extracted_path) as img:
+        assert img.size[0] > 0 and img.size[1] > 0, "Extracted image has invalid dimensions"
 
 
-def test_extract_image_from_pdf_text_only(tmp_path, monkeypatch):
+def test_extract_image_from_pdf_text_only(pdf_base):
     """Test rendering of PDF page when no embedded image exists."""
-    if not PYMUPDF_AVAILABLE:
-        print("PyMuPDF not available, skipping test")
-        return
-
-    base_dir = str(tmp_path)
-    # Set up temporary working directory
-    monkeypatch.setenv("IMAGE_SELECTOR_WORKING_DIR", base_dir)
+    base_dir = str(pdf_base)
 
     pdf_path = os.path.join(base_dir, "test_text_only.pdf")
 
@@ -143,29 +131,40 @@ def test_extract_image_from_pdf_text_only(tmp_path, monkeypatch):
         return
 
     # Extract/render the page
-    extracted_path = extract_image_from_pdf(pdf_path)
+    extracted_path = extract_image_from_pdf(pdf_path, dpi=TEST_RENDER_DPI)
 
     # Verify the rendering
     assert extracted_path is not None, "Failed to render PDF page"
     assert os.path.exists(extracted_path), f"Rendered image does not exist at {extracted_path}"
-    assert "_rendered.png" in extracted_path, "Output should be a rendered PNG"
+    assert "_rendered.png" in extracted_path, "Output should be a lossless rendered PNG"
 
     # Verify it's a valid image
-    img = Image.open(extracted_path)
-    assert img is not None, "Rendered file is not a valid image"
-    assert img.size[0] > 0 and img.size[1] > 0, "Rendered image has invalid dimensions"
-    img.close()  # Close the image handle
+    with Image.open(extracted_path) as img:
+        assert img.size[0] > 0 and img.size[1] > 0, "Rendered image has invalid dimensions"
+        # A4 (595x842 pt) rendered at TEST_RENDER_DPI
+        assert img.size == (298, 421), f"Unexpected render size {img.size}"
 
 
-def test_image_selector_gui_with_pdf(tmp_path, monkeypatch):
-    """Test ImageSelectorGUI initialization with a PDF file."""
-    if not PYMUPDF_AVAILABLE:
-        print("PyMuPDF not available, skipping test")
+def test_extract_image_from_pdf_small_image_is_rendered(pdf_base):
+    """Test that embedded images below the size threshold fall back to page rendering."""
+    base_dir = str(pdf_base)
+
+    pdf_path = os.path.join(base_dir, "test_small_image.pdf")
+    success = create_test_pdf_with_image(pdf_path, image_size=(400, 300), image_color=(0, 0, 255))
+    if not success:
+        print("Failed to create test PDF, skipping test")
         return
 
-    base_dir = str(tmp_path)
-    # Set up temporary working directory
-    monkeypatch.setenv("IMAGE_SELECTOR_WORKING_DIR", base_dir)
+    extracted_path = extract_image_from_pdf(pdf_path, dpi=TEST_RENDER_DPI)
+
+    assert extracted_path is not None, "Failed to render PDF page"
+    assert "_rendered.png" in extracted_path, "Small embedded image should not be extracted"
+
+
+@pytest.mark.xdist_group(name="gui")
+def test_image_selector_gui_with_pdf(pdf_base):
+    """Test ImageSelectorGUI initialization with a PDF file."""
+    base_dir = str(pdf_base)
 
     pdf_path = os.path.join(base_dir, "test_gui.pdf")
 
@@ -193,15 +192,10 @@ def test_image_selector_gui_with_pdf(tmp_path, monkeypatch):
     assert gui.image is not None, "Resized image was not created"
 
 
-def test_export_regions_from_pdf(tmp_path, monkeypatch):
+@pytest.mark.xdist_group(name="gui")
+def test_export_regions_from_pdf(pdf_base):
     """Test exporting regions from a PDF-sourced image."""
-    if not PYMUPDF_AVAILABLE:
-        print("PyMuPDF not available, skipping test")
-        return
-
-    base_dir = str(tmp_path)
-    # Set up temporary working directory
-    monkeypatch.setenv("IMAGE_SELECTOR_WORKING_DIR", base_dir)
+    base_dir = str(pdf_base)
 
     pdf_path = os.path.join(base_dir, "test_export.pdf")
 
@@ -238,10 +232,6 @@ def test_export_regions_from_pdf(tmp_path, monkeypatch):
 
 def test_pdf_with_invalid_file():
     """Test error handling for invalid PDF file."""
-    if not PYMUPDF_AVAILABLE:
-        print("PyMuPDF not available, skipping test")
-        return
-
     # Test with non-existent file
     result = extract_image_from_pdf("/path/to/nonexistent.pdf")
     assert result is None, "Should return None for invalid file"
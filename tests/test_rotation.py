@@ -1,194 +1,173 @@
 import os
-import sys
-import types
-
-# Ensure the package in src/ is importable during tests
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-SRC = os.path.join(ROOT, "src")
-if SRC not in sys.path:
-    sys.path.insert(0, SRC)
-
-# Provide lightweight mocks for the external 'mcp' package so tests can run
-# without the real dependency installed.
-if "mcp" not in sys.modules:
-    _m = types.ModuleType("mcp")
-    _m_server = types.ModuleType("mcp.server")
-    setattr(_m_server, "Server", object)
-    _m_server_stdio = types.ModuleType("mcp.server.stdio")
-    _m_types = types.ModuleType("mcp.types")
-    setattr(_m_types, "Tool", object)
-    setattr(_m_types, "TextContent", object)
-    sys.modules["mcp"] = _m
-    sys.modules["mcp.server"] = _m_server
-    sys.modules["mcp.server.stdio"] = _m_server_stdio
-    sys.modules["mcp.types"] = _m_types
+
+import pytest  # type: ignore
+from PIL import Image
 
 from mcp_server_image_selector.gui import ImageSelectorGUI
 
-TEST_IMAGE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Scan20250919130047_1.jpeg"))
+# 212x300 downscaled copy of the sample scan (Scan20250919130047_1.jpeg)
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "scan_small.jpeg")
+
+# Keep the ImageSelectorGUI tests on one worker under pytest-xdist (--dist loadgroup)
+pytestmark = pytest.mark.xdist_group(name="gui")
+
+
+@pytest.fixture(scope="session")
+def _base_image():
+    """Decodes the test scan once per session"""
+    with Image.open(TEST_IMAGE) as img:
+        return img.copy()
+
+
+@pytest.fixture
+def gui(tmp_path, _base_image, monkeypatch):
+    """ImageSelectorGUI on a fresh copy of the shared test scan (no JPEG decode per test)"""
+    from mcp_server_image_selector import image_cache
 
+    orig_load = image_cache.load_image_cached
 
-def test_rotate_image_90_degrees_right(tmp_path):
+    def _load(path, cache_dir, *args, **kwargs):
+        if path == TEST_IMAGE:
+            return _base_image.copy()
+        return orig_load(path, cache_dir, *args, **kwargs)
+
+    monkeypatch.setattr(image_cache, "load_image_cached", _load)
+    return ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
+
+
+def test_rotate_image_90_degrees_right(gui):
     """Test rotating image 90 degrees to the right"""
-    gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        original_width, original_height = gui.original_image.size
+    original_width, original_height = gui.original_image.size
 
-        # Rotate 90 degrees right
-        gui.rotate_image(90)
+    # Rotate 90 degrees right
+    gui.rotate_image(90)
 
-        # After 90° rotation, width and height should be swapped
-        new_width, new_height = gui.original_image.size
-        assert new_width == original_height
-        assert new_height == original_width
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
+    # After 90° rotation, width and height should be swapped
+    new_width, new_height = gui.original_image.size
+    assert new_width == original_height
+    assert new_height == original_width
 
 
-def test_rotate_image_90_degrees_left(tmp_path):
+def test_rotate_image_90_degrees_left(gui):
     """Test rotating image 90 degrees to the left"""
-    gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        original_width, original_height = gui.original_image.size
+    original_width, original_height = gui.original_image.size
 
-        # Rotate 90 degrees left
-        gui.rotate_image(-90)
+    # Rotate 90 degrees left
+    gui.rotate_image(-90)
 
-        # After 90° rotation, width and height should be swapped
-        new_width, new_height = gui.original_image.size
-        assert new_width == original_height
-        assert new_height == original_width
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
+    # After 90° rotation, width and height should be swapped
+    new_width, new_height = gui.original_image.size
+    assert new_width == original_height
+    assert new_height == original_width
 
 
-def test_rotate_image_180_degrees(tmp_path):
+def test_rotate_image_180_degrees(gui):
     """Test rotating image 180 degrees"""
-    gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        original_width, original_height = gui.original_image.size
+    original_width, original_height = gui.original_image.size
 
-        # Rotate 180 degrees
-        gui.rotate_image(180)
+    # Rotate 180 degrees
+    gui.rotate_image(180)
 
-        # After 180° rotation, dimensions should remain the same
-        new_width, new_height = gui.original_image.size
-        assert new_width == original_width
-        assert new_height == original_height
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
+    # After 180° rotation, dimensions should remain the same
+    new_width, new_height = gui.original_image.size
+    assert new_width == original_width
+    assert new_height == original_height
 
 
-def test_rotate_image_clears_regions(tmp_path):
+def test_rotate_image_clears_regions(gui):
     """Test that rotating image clears all saved regions"""
-    gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        # Add some mock regions
-        gui.regions = [
-            {"coords": (10, 10, 100, 100), "mode": "foto", "rect_id": None},
-            {"coords": (200, 200, 300, 300), "mode": "text", "rect_id": None}
-        ]
-
-        # Set current selection
-        gui.current_selection = (50, 50, 150, 150)
-
-        # Rotate image
-        gui.rotate_image(90)
-
-        # Verify regions are cleared
-        assert len(gui.regions) == 0
-        assert gui.current_selection is None
-        assert gui.current_rect is None
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
-
-
-def test_rotate_image_full_circle(tmp_path):
-    """Test that rotating 4 times by 90 degrees returns to original dimensions"""
-    gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        original_width, original_height = gui.original_image.size
-
-        # Rotate 4 times by 90 degrees right (full circle)
-        for _ in range(4):
-            gui.rotate_image(90)
-
-        # Should be back to original dimensions
-        final_width, final_height = gui.original_image.size
-        assert final_width == original_width
-        assert final_height == original_height
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
-
-
-def test_rotate_image_with_no_image(tmp_path):
+    # Add some mock regions
+    gui.regions = [
+        {"coords": (10, 10, 100, 100), "mode": "foto", "rect_id": None},
+        {"coords": (200, 200, 300, 300), "mode": "text", "rect_id": None}
+    ]
+
+    # Set current selection
+    gui.current_selection = (50, 50, 150, 150)
+
+    # Rotate image
+    gui.rotate_image(90)
+
+    # Verify regions are cleared
+    assert len(gui.regions) == 0
+    assert gui.current_selection is None
+    assert gui.current_rect is None
+
+
+def test_rotate_image_full_circle(gui):
+    """Test that rotating right and then left returns to the original image"""
+    original_width, original_height = gui.original_image.size
+    corner = gui.original_image.getpixel((0, 0))
+
+    # Rotate 90 degrees right: dimensions swapped
+    gui.rotate_image(90)
+    assert gui.original_image.size == (original_height, original_width)
+
+    # Rotate 90 degrees left: back to the original orientation
+    gui.rotate_image(-90)
+    assert gui.original_image.size == (original_width, original_height)
+    assert gui.original_image.getpixel((0, 0)) == corner
+
+
+def test_rotate_image_with_no_image(gui):
     """Test that rotate_image handles None image gracefully"""
-    gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        # Set image to None
-        gui.original_image = None
+    # Set image to None
+    gui.original_image = None
 
-        # Should not raise an error
-        gui.rotate_image(90)
+    # Should not raise an error
+    gui.rotate_image(90)
 
-        # Image should still be None
-        assert gui.original_image is None
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
+    # Image should still be None
+    assert gui.original_image is None
 
 
-def test_export_with_rotated_image(tmp_path):
+def test_export_with_rotated_image(_base_image, tmp_path):
     """Test that export uses the rotated image, not the original"""
     from mcp_server_image_selector.export import export_regions
-    from PIL import Image
-
-    gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        # Get original dimensions
-        original_width, original_height = gui.original_image.size
-
-        # Rotate 90 degrees
-        gui.rotate_image(90)
-
-        # Verify rotation happened
-        rotated_width, rotated_height = gui.original_image.size
-        assert rotated_width == original_height
-        assert rotated_height == original_width
-
-        # Create a test region that covers a portion of the rotated image
-        # Using coordinates relative to rotated image
-        test_region = {
-            "coords": (10, 10, 100, 100),
-            "mode": "foto",
-            "rect_id": None
-        }
-
-        # Export the region with the rotated image
-        result = export_regions(
-            TEST_IMAGE,
-            [test_region],
-            str(tmp_path),
-            image_object=gui.original_image
-        )
-
-        # Verify export was successful
-        assert result["success"] is True
-        assert result["exported_count"] == 1
-
-        # Load the exported image and verify it came from the rotated image
-        exported_file = result["files"][0]["file"]
-        assert os.path.exists(exported_file)
-
-        exported_image = Image.open(exported_file)
+
+    # Same transpose as rotate_image(90); the GUI itself is not needed here
+    original_width, original_height = _base_image.size
+    rotated = _base_image.transpose(Image.Transpose.ROTATE_270)
+    assert rotated.size == (original_height, original_width)
+
+    # Create a test region that covers a portion of the rotated image
+    # Using coordinates relative to rotated image
+    test_region = {
+        "coords": (10, 10, 100, 100),
+        "mode": "foto",
+        "rect_id": None
+    }
+
+    # Export the region with the rotated image
+    result = export_regions(
+        TEST_IMAGE,
+        [test_region],
+        str(tmp_path),
+        image_object=rotated
+    )
+
+    # Verify export was successful
+    assert result["success"] is True
+    assert result["exported_count"] == 1
+
+    # Load the exported image and verify it came from the rotated image
+    exported_file = result["files"][0]["file"]
+    assert os.path.exists(exported_file)
+
+    with Image.open(exported_file) as exported_image:
         # The exported region should be 90x90 pixels (100-10 = 90)
         assert exported_image.size == (90, 90)
 
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
+
+def test_rotate_image_90_degrees_right_is_clockwise(tmp_path):
+    """Test that a 90° right rotation moves the top-left pixel to the top-right"""
+    img_path = str(tmp_path / "marker.png")
+    img = Image.new("RGB", (30, 20), (0, 0, 0))
+    img.putpixel((0, 0), (255, 0, 0))
+    img.save(img_path, "PNG")
+
+    gui = ImageSelectorGUI(img_path, str(tmp_path), create_ui=False)
+    gui.rotate_image(90)
+
+    assert gui.original_image.size == (20, 30)
+    assert gui.original_image.getpixel((19, 0)) == (255, 0, 0)
@@ -1,48 +1,71 @@
 import os
+import subprocess
 import sys
-import types
-
-# Ensure the package in src/ is importable during tests
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-SRC = os.path.join(ROOT, "src")
-if SRC not in sys.path:
-    sys.path.insert(0, SRC)
-
-# Provide lightweight mocks for the external 'mcp' package so tests can run
-# without the real dependency installed.
-if "mcp" not in sys.modules:
-    _m = types.ModuleType("mcp")
-    _m_server = types.ModuleType("mcp.server")
-    setattr(_m_server, "Server", object)
-    _m_server_stdio = types.ModuleType("mcp.server.stdio")
-    _m_types = types.ModuleType("mcp.types")
-    setattr(_m_types, "Tool", object)
-    setattr(_m_types, "TextContent", object)
-    sys.modules["mcp"] = _m
-    sys.modules["mcp.server"] = _m_server
-    sys.modules["mcp.server.stdio"] = _m_server_stdio
-    sys.modules["mcp.types"] = _m_types
+from pathlib import Path
+
+import pytest  # type: ignore
 
 from mcp_server_image_selector.gui import ImageSelectorGUI
 
-TEST_IMAGE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Scan20250919130047_1.jpeg"))
+# 212x300 downscaled copy of the sample scan (Scan20250919130047_1.jpeg)
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "scan_small.jpeg")
+
+# Keep the ImageSelectorGUI tests on one worker under pytest-xdist (--dist loadgroup)
+pytestmark = pytest.mark.xdist_group(name="gui")
 
 
 def test_load_image_sets_original_image(tmp_path):
     gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        assert gui.original_image is not None
-        assert gui.original_image.size[0] > 0
-        assert gui.original_image.size[1] > 0
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
+    assert gui.original_image is not None
+    assert gui.original_image.size[0] > 0
+    assert gui.original_image.size[1] > 0
+    # headless: no Tk root is created, so there is nothing to tear down
+    assert gui.root is None
 
 
 def test_scale_factor_within_bounds(tmp_path):
     gui = ImageSelectorGUI(TEST_IMAGE, str(tmp_path), create_ui=False)
-    try:
-        assert 0 < gui.scale_factor <= 1.0
-    finally:
-        if getattr(gui, "root", None):
-            gui.root.destroy()
+    # the small fixture is enlarged (at most 25%), large scans are reduced (see below);
+    # either way the display copy fits the 1600x1280 headless canvas
+    assert 0 < gui.scale_factor <= 1.25
+    assert gui.image.width <= 1600 and gui.image.height <= 1280
+
+
+def test_headless_image_integer_downscale(tmp_path):
+    from PIL import Image
+
+    # 3200x2560 -> scale 0.5 on the 1600x1280 default canvas (reduce() path)
+    img_path = str(tmp_path / "large.png")
+    Image.new("L", (3200, 2560), 128).save(img_path, "PNG")
+
+    gui = ImageSelectorGUI(img_path, str(tmp_path), create_ui=False)
+    assert gui.scale_factor == 0.5
+    assert gui.image.size == (1600, 1280)
+    assert gui.original_image.size == (3200, 2560)
+
+
+def test_headless_image_integer_downscale_palette(tmp_path):
+    from PIL import Image
+
+    # reduce() rejects "P"/"1" - palette images (e.g. GIF) must still load headless
+    img_path = str(tmp_path / "large.gif")
+    Image.new("P", (3200, 2560), 3).save(img_path, "GIF")
+
+    gui = ImageSelectorGUI(img_path, str(tmp_path), create_ui=False)
+    assert gui.original_image.mode == "P"
+    assert gui.scale_factor == 0.5
+    assert gui.image.size == (1600, 1280)
+
+    gui.rotate_image(90)
+    assert gui.original_image.size == (2560, 3200)
+
+
+def test_import_server_creates_no_directories(tmp_path):
+    # Importing the module (e.g. for the export_regions re-export) must not touch the filesystem
+    src = str(Path(__file__).resolve().parent.parent / "src")
+    env = dict(os.environ, PYTHONPATH=src, IMAGE_SELECTOR_WORKING_DIR=str(tmp_path))
+    subprocess.run(
+        [sys.executable, "-c", "import mcp_server_image_selector.server"],
+        cwd=tmp_path, env=env, check=True,
+    )
+    assert os.listdir(tmp_path) == []